@@ -17,6 +17,15 @@ import re
 import sys
 
 
+class SVGParseError(ValueError):
+    """Raised when a SVG document cannot be converted."""
+
+
+_MATRIX_RE = re.compile(r'matrix\((.*)\)')
+_STOP_COLOR_RE = re.compile(r'.*stop-color:#([0-9a-fA-F]{6})')
+_STOP_OPACITY_RE = re.compile(r'.*stop-opacity:([-+]?[0-9]*\.?[0-9]+)')
+
+
 class Definition(object):
 
     def generate_stmts(self):
@@ -25,17 +34,18 @@ class Definition(object):
 class LinearGradientDefinition(Definition):
 
     def __init__(self, element):
-        x1 = float(element.attrib['x1'])
-        y1 = float(element.attrib['y1'])
-        x2 = float(element.attrib['x2'])
-        y2 = float(element.attrib['y2'])
+        attrib = element.attrib
+        x1 = float(attrib['x1'])
+        y1 = float(attrib['y1'])
+        x2 = float(attrib['x2'])
+        y2 = float(attrib['y2'])
 
         # Determines the transform.
         self.transform = None
-        transform = element.attrib.get('gradientTransform', None)
+        transform = attrib.get('gradientTransform', None)
         self.should_restore = False
         if transform:
-            match = re.match(r'matrix\((.*)\)', transform)
+            match = _MATRIX_RE.match(transform)
             if match:
                 transform = match.group(1).split()
                 if (len(transform) == 6):
@@ -49,14 +59,13 @@ class LinearGradientDefinition(Definition):
 
             # Determines the color.
             style = stop.get('style')
-            color_match = re.match(r'.*stop-color:#([0-9a-fA-F]{6})', style)
+            color_match = _STOP_COLOR_RE.match(style)
             if not color_match:
                 continue
             color = color_match.group(1)
 
             # Determines the opacity.
-            opacity_match = re.match(r'.*stop-opacity:([-+]?[0-9]*\.?[0-9]+)',
-                                     style)
+            opacity_match = _STOP_OPACITY_RE.match(style)
             if opacity_match:
                 opacity = float(opacity_match.group(1)) * 255
             else:
@@ -81,8 +90,8 @@ class LinearGradientDefinition(Definition):
         self.stops = sorted(self.stops, key=(lambda x: x['offset']))
 
         if len(self.stops) > 2:
-            print("<linearGradient> currently only supports two stops.")
-            exit(1)
+            raise SVGParseError(
+                "<linearGradient> currently only supports two stops.")
 
     def generate_stmts(self):
         stmts = []
@@ -12,11 +12,16 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import logging
 import re
 import sys
 
 from svgelements import svgelements
 
+
+logger = logging.getLogger(__name__)
+
+
 class Generator(object):
 
     def __init__(self, stmts, context='context'):
@@ -39,8 +44,8 @@ class Generator(object):
         if len(args) == 1:
             stmt = 'nvg%s(%s);' % (command, self.context)
         else:
-            args = tuple(str(arg) for arg in args[1:])
-            stmt = 'nvg%s(%s, %s);' % (command, self.context, ', '.join(args))
+            stmt = 'nvg%s(%s, %s);' % (command, self.context,
+                                       ', '.join(map(str, args[1:])))
         return stmt
 
     def arc_to(self, x1, y1, x2, y2, radius):
@@ -89,7 +94,8 @@ class Generator(object):
         elif (value == 'square'):
             join = 'NVG_SQUARE'
         else:
-            print(' !! Not supported value for nvgLineCap():', value)
+            logger.warning('Not supported value for nvgLineCap(): %s', value)
+            return
 
         self.__append_stmt('LineCap', join)
 
@@ -104,7 +110,8 @@ class Generator(object):
         elif (value == 'round'):
             join = 'NVG_ROUND'
         else:
-            print(' !! Not supported value for nvgLineJoin():', value)
+            logger.warning('Not supported value for nvgLineJoin(): %s', value)
+            return
 
         self.__append_stmt('LineJoin', join)
 
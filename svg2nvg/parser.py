@@ -12,26 +12,34 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import collections
+import functools
+import logging
 import os
 import re
+import sys
 
 import svgelements
 from svg2nvg import definitions
 from svg2nvg import generator
 
 
+logger = logging.getLogger(__name__)
+
+_FILL_URL_RE = re.compile(r'url\(#(.*)\)')
+
+
 def element(method):
     """Decorator for parsing a element.
 
     This decorator simply wraps the method between generator's begin_path() and
     end_path() calls with the tag name as the parameter.
     """
-    def inner(*args, **kwargs):
-        self = args[0]
-        element = args[1]
+    @functools.wraps(method)
+    def inner(self, element):
         element.properties = self.get_properties(element)
         if self.begin_element(element):
-            method(*args, **kwargs)
+            method(self, element)
             self.end_element(element)
     return inner
 
@@ -43,8 +51,30 @@ class SVGParser(object):
         self.groups = list()
         self.linear_gradients = dict()
         self.stmts = list()
-        self.properties = list()
+        self.properties = collections.ChainMap()
         self.path_began = False
+        self.subpath_count = 0
+
+        self.__element_parsers = {
+            svgelements.Circle: self.__parse_circle,
+            svgelements.Ellipse: self.__parse_ellipse,
+            svgelements.Group: self.__parse_group,
+            svgelements.Path: self.__parse_path,
+            svgelements.Polygon: self.__parse_polygon,
+            svgelements.Polyline: self.__parse_polyline,
+            svgelements.Rect: self.__parse_rect,
+            svgelements.SimpleLine: self.__parse_line,
+        }
+
+        segments = svgelements.svgelements
+        self.__segment_parsers = {
+            segments.Arc: self.__parse_segment_arc,
+            segments.Close: self.__parse_segment_close,
+            segments.CubicBezier: self.__parse_segment_cubic_bezier,
+            segments.Line: self.__parse_segment_line,
+            segments.Move: self.__parse_segment_move,
+            segments.QuadraticBezier: self.__parse_segment_quadratic_bezier,
+        }
 
     def __begin_path(self, element):
         if self.path_began is True and \
@@ -57,14 +87,17 @@ class SVGParser(object):
     def __end_path(self, element):
         self.__process_properties(element, 'stroke_width', 'stroke')
 
-        try:
-            fill_id_match = re.match(r'url\(#(.*)\)', element.values['fill'])
-            fill_id = fill_id_match.group(1)
-            gradient = self.linear_gradients[fill_id]
-        except:
+        if not self.linear_gradients:
             self.__process_property(element, 'fill')
         else:
-            self.__fill_linear_gradient(element, gradient)
+            try:
+                fill_id_match = _FILL_URL_RE.match(element.values['fill'])
+                fill_id = fill_id_match.group(1)
+                gradient = self.linear_gradients[fill_id]
+            except:
+                self.__process_property(element, 'fill')
+            else:
+                self.__fill_linear_gradient(element, gradient)
 
         while element.save_count > 0:
             self.__restore(element)
@@ -114,6 +147,7 @@ class SVGParser(object):
 
     @element
     def __parse_group(self, group):
+        element_parsers = self.__element_parsers
         for child in group:
             try:
                 if child.values['visibility'] == 'hidden':
@@ -121,26 +155,15 @@ class SVGParser(object):
             except (KeyError, AttributeError):
                 pass
 
-            if isinstance(child, svgelements.Circle):
-                self.__parse_circle(child)
-            elif isinstance(child, svgelements.Ellipse):
-                self.__parse_ellipse(child)
+            element_parser = element_parsers.get(child.__class__)
+            if element_parser is not None:
+                element_parser(child)
             elif isinstance(child, svgelements.Group):
                 self.__parse_group(child)
-            elif isinstance(child, svgelements.Path):
-                self.__parse_path(child)
-            elif isinstance(child, svgelements.Polygon):
-                self.__parse_polygon(child)
-            elif isinstance(child, svgelements.Polyline):
-                self.__parse_polyline(child)
-            elif isinstance(child, svgelements.Rect):
-                self.__parse_rect(child)
-            elif isinstance(child, svgelements.SimpleLine):
-                self.__parse_line(child)
             elif isinstance(child, svgelements.SVGElement):
                 self.__parse_other_element(child)
             elif isinstance(child, svgelements.Shape):
-                print(" !! Unsupported shape:", element.__class__)
+                logger.warning('Unsupported shape: %s', child.__class__)
 
         while group.save_count > 0:
             self.__restore(group)
@@ -163,36 +186,15 @@ class SVGParser(object):
 
     @element
     def __parse_path(self, element):
-        subpath_count = 0
+        self.subpath_count = 0
+        segment_parsers = self.__segment_parsers
         for segment in element:
-            if (isinstance(segment, svgelements.svgelements.Arc)):
-                pass
-            elif (isinstance(segment, svgelements.svgelements.Close)):
-                self.generator.close_path()
-                if subpath_count > 1:
-                    self.generator.path_winding_hole()
-            elif (isinstance(segment, svgelements.svgelements.CubicBezier)):
-                control1 = segment.control1
-                control2 = segment.control2
-                point = segment.end
-                self.generator.bezier_to(control1.x, control1.y,
-                                         control2.x, control2.y,
-                                         point.x, point.y)
-            elif (isinstance(segment, svgelements.svgelements.Line)):
-                point = segment.end
-                self.generator.line_to(point.x, point.y)
-            elif (isinstance(segment, svgelements.svgelements.Move)):
-                subpath_count += 1
-                point = segment.end
-                self.generator.move_to(point.x, point.y)
-            elif (isinstance(segment, svgelements.svgelements.QuadraticBezier)):
-                control = segment.control
-                point = segment.end
-                self.generator.bezier_to(control1.x, control1.y,
-                                         control2.x, control2.y,
-                                         point.x, point.y)
+            segment_parser = segment_parsers.get(segment.__class__)
+            if segment_parser is not None:
+                segment_parser(segment)
             else:
-                print(segment.__class__)
+                logger.warning('Unsupported path segment: %s',
+                               segment.__class__)
 
     @element
     def __parse_polygon(self, element):
@@ -200,11 +202,13 @@ class SVGParser(object):
             return
 
         first_point = element.points[0]
+        move_to = self.generator.move_to
+        line_to = self.generator.line_to
         for point in element.points:
             if point == first_point:
-                self.generator.move_to(point.x, point.y)
+                move_to(point.x, point.y)
             else:
-                self.generator.line_to(point.x, point.y)
+                line_to(point.x, point.y)
 
         if point != first_point:
             self.generator.close_path()
@@ -215,23 +219,56 @@ class SVGParser(object):
             return
 
         first_point = element.points[0]
+        move_to = self.generator.move_to
+        line_to = self.generator.line_to
         for point in element.points:
             if point == first_point:
-                self.generator.move_to(point.x, point.y)
+                move_to(point.x, point.y)
             else:
-                self.generator.line_to(point.x, point.y)
+                line_to(point.x, point.y)
 
     @element
     def __parse_rect(self, element):
         self.generator.rect(element.x, element.y, element.width, element.height)
 
+    def __parse_segment_arc(self, segment):
+        pass
+
+    def __parse_segment_close(self, segment):
+        self.generator.close_path()
+        if self.subpath_count > 1:
+            self.generator.path_winding_hole()
+
+    def __parse_segment_cubic_bezier(self, segment):
+        control1 = segment.control1
+        control2 = segment.control2
+        point = segment.end
+        self.generator.bezier_to(control1.x, control1.y,
+                                 control2.x, control2.y,
+                                 point.x, point.y)
+
+    def __parse_segment_line(self, segment):
+        point = segment.end
+        self.generator.line_to(point.x, point.y)
+
+    def __parse_segment_move(self, segment):
+        self.subpath_count += 1
+        point = segment.end
+        self.generator.move_to(point.x, point.y)
+
+    def __parse_segment_quadratic_bezier(self, segment):
+        control = segment.control
+        point = segment.end
+        self.generator.quad_to(control.x, control.y, point.x, point.y)
+
     def __parse_stop(self, element):
         if not self.linear_gradients:
             return
 
-        stop_color = svgelements.svgelements.Color(element.values['stop-color'])
+        values = element.values
+        stop_color = svgelements.svgelements.Color(values['stop-color'])
         gradient = self.linear_gradients[list(self.linear_gradients)[-1]]
-        gradient.stops[float(element.values['offset'])] = stop_color
+        gradient.stops[float(values['offset'])] = stop_color
 
     def __check_property_changed(self, element, *property_names):
         for property_name in property_names:
@@ -257,10 +294,7 @@ class SVGParser(object):
         return False
 
     def __get_current_property_value(self, property_name):
-        for properties in reversed(self.properties):
-            if property_name in properties:
-                return properties[property_name]
-        return None
+        return self.properties.get(property_name)
 
     def __process_property(self, element, property_name):
         """Updates a current property with an element's property.
@@ -303,7 +337,7 @@ class SVGParser(object):
                                      expected_value[2], expected_value[3],
                                      expected_value[4], expected_value[5])
 
-        self.properties[-1][property_name] = expected_value
+        self.properties[property_name] = expected_value
 
     def __process_properties(self, element, *property_names):
         for property_name in property_names:
@@ -311,12 +345,12 @@ class SVGParser(object):
 
     def __restore(self, element):
         element.save_count -= 1
-        self.properties.pop()
+        self.properties = self.properties.parents
         self.generator.restore()
 
     def __save(self, element):
         element.save_count += 1
-        self.properties.append(dict())
+        self.properties = self.properties.new_child()
         self.generator.save()
 
     def begin_element(self, element):
@@ -347,14 +381,16 @@ class SVGParser(object):
         properties = dict()
         values = element.values
 
+        # Interning makes the later equality checks against stored property
+        # values pointer comparisons for the many elements sharing a value.
         if 'stroke-linecap' in values:
-            properties['linecap'] = values['stroke-linecap']
+            properties['linecap'] = sys.intern(values['stroke-linecap'])
 
         if 'stroke-linejoin' in values:
-            properties['linejoin'] = values['stroke-linejoin']
+            properties['linejoin'] = sys.intern(values['stroke-linejoin'])
 
         if 'stroke-miterlimit' in values:
-            properties['miterlimit'] = values['stroke-miterlimit']
+            properties['miterlimit'] = sys.intern(values['stroke-miterlimit'])
 
         properties['transform'] = element.transform
 
@@ -372,85 +408,85 @@ class SVGParser(object):
         guard_constant = 'SVG2NVG_%s_H_' % basename.upper()
         title = basename.title().replace('_', '')
 
-        result = '#ifndef %s\n' % guard_constant
-        result += '#define %s\n\n' % guard_constant
+        parts = ['#ifndef %s\n' % guard_constant,
+                 '#define %s\n\n' % guard_constant]
 
         if nanovg_include_path:
-            result += '#include "%s"\n\n' % nanovg_include_path
+            parts.append('#include "%s"\n\n' % nanovg_include_path)
 
         if namespace:
-            result += 'namespace %s {\n\n' % namespace
+            parts.append('namespace %s {\n\n' % namespace)
 
         if builds_object:
             function_name = 'Draw'
             inheritance = ' : public %s' % baseclass if baseclass else ''
-            result += 'class %s%s {\n' % (title, inheritance)
-            result += ' public:\n'
-            result += '  double GetWidth() const final { return %s; }\n' % \
-                      self.canvas_width
-            result += '  double GetHeight() const final { return %s; }\n\n' % \
-                      self.canvas_height
+            parts.append('class %s%s {\n' % (title, inheritance))
+            parts.append(' public:\n')
+            parts.append('  double GetWidth() const final { return %s; }\n' %
+                         self.canvas_width)
+            parts.append('  double GetHeight() const final { return %s; }\n\n' %
+                         self.canvas_height)
         else:
             function_name = 'Render%s' % title
 
         prototype = '  void %s(NVGcontext *%s) const final' % \
                     (function_name, self.context)
         if prototype_only:
-            result += '%s;\n' % prototype
+            parts.append('%s;\n' % prototype)
         else:
-            result += 'static %s {\n' % prototype
+            parts.append('static %s {\n' % prototype)
             for stmt in self.stmts:
-                result += '  %s\n' % stmt
-            result += '}\n'
+                parts.append('  %s\n' % stmt)
+            parts.append('}\n')
 
         if builds_object:
-            result += '};\n'
+            parts.append('};\n')
 
-        result += '\n'
+        parts.append('\n')
         if namespace:
-            result += '}  // namespace %s\n\n' % namespace
-        result += '#endif  // %s\n' % guard_constant
-        return result
+            parts.append('}  // namespace %s\n\n' % namespace)
+        parts.append('#endif  // %s\n' % guard_constant)
+        return ''.join(parts)
 
     def get_source_file_content(self, filename, nanovg_include_path,
                                 namespace='',
                                 header_include_path=None,
                                 builds_object=False):
-        result = ''
         basename = os.path.splitext(os.path.basename(filename))[0]
         if header_include_path is None:
             header_include_path = ''
         header_name = '%s.h' % basename
         header_include_path = os.path.join(header_include_path, header_name)
-        result += '#include "%s"\n\n' % header_include_path
+        parts = ['#include "%s"\n\n' % header_include_path]
 
         if nanovg_include_path:
-            result += '#include "%s"\n\n' % nanovg_include_path
+            parts.append('#include "%s"\n\n' % nanovg_include_path)
 
         if namespace:
-            result += 'namespace %s {\n\n' % namespace
+            parts.append('namespace %s {\n\n' % namespace)
 
         title = basename.title().replace('_', '')
-        result += 'void '
         if builds_object:
             function_name = 'Draw'
-            result += '%s::' % title
+            parts.append('void %s::' % title)
         else:
             function_name = 'Render%s' % title
-        result += '%s(NVGcontext *%s) const {\n' % (function_name, self.context)
+            parts.append('void ')
+        parts.append('%s(NVGcontext *%s) const {\n' %
+                     (function_name, self.context))
         for stmt in self.stmts:
-            result += '  %s\n' % stmt
-        result += '}\n\n'
+            parts.append('  %s\n' % stmt)
+        parts.append('}\n\n')
         if namespace:
-            result += '}  // namespace %s\n' % namespace
-        return result
+            parts.append('}  // namespace %s\n' % namespace)
+        return ''.join(parts)
 
     def parse(self, source):
         svg = svgelements.SVG.parse(source, color=None)
         self.groups.clear()
         self.linear_gradients.clear()
-        self.properties.clear()
-        self.properties.append(dict(transform=[1, 0, 0, 1, 0, 0]))
+        self.properties = collections.ChainMap(
+            dict(transform=[1, 0, 0, 1, 0, 0]))
         self.canvas_width = svg.width
         self.canvas_height = svg.height
         self.generator = generator.Generator(self.stmts, self.context)